@@ -3,16 +3,23 @@ import sys
 import time
 import tempfile
 import shutil
-import schedule
 import threading
 import re
-from datetime import datetime
-from flask import Flask, request, jsonify, Response, stream_with_context
+import subprocess
+import hashlib
+import orjson
+from cachetools import LRUCache, TTLCache
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from operator import attrgetter
+from uuid import uuid4
+from flask import Flask, Request, request, jsonify, Response, stream_with_context
+from flask.json.provider import JSONProvider
 from werkzeug.utils import secure_filename
+from waitress import serve
 from dotenv import load_dotenv
 import fal_client
-from pydub import AudioSegment
-from encryption import decrypt
+from encryption import decrypt, get_cipher
 from youtube_transcript_api import YouTubeTranscriptApi, NoTranscriptFound, VideoUnavailable
 from youtube_transcript_api.proxies import GenericProxyConfig
 from flask_cors import CORS
@@ -22,11 +29,21 @@ load_dotenv()
 
 # Constants
 MAX_FILE_SIZE = 2 * 1024 * 1024 * 1024  # 2 GB in bytes
-TEMP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "temp")
+TRANSCRIPT_CACHE_SIZE = 1000
+TRANSCRIPT_CACHE_TTL = 3600  # 1 hour
+FAL_CLIENT_CACHE_SIZE = 64
+SERVER_THREADS = int(os.environ.get("SERVER_THREADS", 32))
+REQUEST_TIMEOUT = 3600  # 1 hour
+SHM_DIR = "/dev/shm"
+COPY_BUFFER_SIZE = 1024 * 1024  # 1 MB
+CLEANUP_WORKERS = 16
+FALLBACK_FETCH_WORKERS = 4
+# Proxy string format: 'username:password@hostname:port'
+PROXY_PATTERN = re.compile(r'^([^:]+):([^@]+)@([^:]+):(\d+)$')
 SECRET_KEY = os.environ.get("SECRET_KEY")
 ALLOWED_AUDIO_EXTENSIONS = {'mp3', 'wav', 'ogg', 'flac', 'm4a', 'aac'}
 ALLOWED_VIDEO_EXTENSIONS = {'mp4', 'avi', 'mov', 'mkv', 'webm', 'flv', 'wmv'}
-SUPPORTED_LANGUAGES = {
+SUPPORTED_LANGUAGES = frozenset({
     'af', 'am', 'ar', 'as', 'az', 'ba', 'be', 'bg', 'bn', 'bo', 'br', 'bs', 'ca', 'cs', 'cy', 
     'da', 'de', 'el', 'en', 'es', 'et', 'eu', 'fa', 'fi', 'fo', 'fr', 'gl', 'gu', 'ha', 'haw', 
     'he', 'hi', 'hr', 'ht', 'hu', 'hy', 'id', 'is', 'it', 'ja', 'jw', 'ka', 'kk', 'km', 'kn', 
@@ -34,35 +51,82 @@ SUPPORTED_LANGUAGES = {
     'my', 'ne', 'nl', 'nn', 'no', 'oc', 'pa', 'pl', 'ps', 'pt', 'ro', 'ru', 'sa', 'sd', 'si', 
     'sk', 'sl', 'sn', 'so', 'sq', 'sr', 'su', 'sv', 'sw', 'ta', 'te', 'tg', 'th', 'tk', 'tl', 
     'tr', 'tt', 'uk', 'ur', 'uz', 'vi', 'yi', 'yo', 'yue', 'zh'
-}
+})
+
+# Keep temporary files on an in-memory filesystem when available, falling back to local disk
+if os.path.isdir(SHM_DIR) and os.access(SHM_DIR, os.W_OK):
+    DEFAULT_TEMP_DIR = os.path.join(SHM_DIR, "ai-tools")
+else:
+    DEFAULT_TEMP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "temp")
+TEMP_DIR = os.environ.get("TEMP_DIR") or DEFAULT_TEMP_DIR
+
+# The secret key is needed to decrypt API keys and proxies, so validate it and derive the cipher once at startup
+if not SECRET_KEY:
+    raise RuntimeError("SECRET_KEY must be configured")
+get_cipher(SECRET_KEY)
 
 # Create temp directory if it doesn't exist
 os.makedirs(TEMP_DIR, exist_ok=True)
+# Also use it for the server's request body buffers. Waitress buffers the whole body before
+# the app parses it into its own spool file, so each upload takes about 2x its size in TEMP_DIR
+tempfile.tempdir = TEMP_DIR
+
+class UploadRequest(Request):
+    """Request that spools uploaded files into TEMP_DIR so they can be staged without copying."""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return tempfile.NamedTemporaryFile(dir=TEMP_DIR, prefix="upload-")
+
+class ORJSONProvider(JSONProvider):
+    """JSON provider backed by orjson, which is much faster on large transcript responses."""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # Skip the str round-trip and hand orjson's bytes straight to the response
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(orjson.dumps(obj), mimetype="application/json")
 
 app = Flask(__name__)
+app.request_class = UploadRequest
+app.json = ORJSONProvider(app)
 # Enable CORS for all routes and origins
 CORS(app, resources={r"/*": {"origins": "*", "allow_headers": "*", "expose_headers": "*"}})
-# Increase maximum file upload size to match our 2GB limit
+# Limit request size to our 2GB limit so oversized uploads are rejected before being buffered
 app.config['MAX_CONTENT_LENGTH'] = MAX_FILE_SIZE
-# Enable streaming uploads
-app.config['MAX_CONTENT_LENGTH'] = None  # Disable content length limit
-# Increase request timeout (in seconds) if using Werkzeug directly
-app.config['TIMEOUT'] = 3600  # 1 hour
+
+# Cache of YouTube transcript responses in the requested language, keyed by (video_id, language, preserve_formatting).
+# Fallback answers are not cached, so a transient failure can't pin a worse transcript for the whole TTL
+transcript_cache = TTLCache(maxsize=TRANSCRIPT_CACHE_SIZE, ttl=TRANSCRIPT_CACHE_TTL)
+transcript_cache_lock = threading.Lock()
+
+# Cache of fal.ai clients, keyed by a hash of the API key, so connections are reused across requests
+# Evicted clients may still be in use by a running request, so they are left for garbage collection to close
+fal_client_cache = LRUCache(maxsize=FAL_CLIENT_CACHE_SIZE)
+fal_client_cache_lock = threading.Lock()
 
 # Force stdout to be line-buffered for Docker logs
 sys.stdout.reconfigure(line_buffering=True)
 
+def remove_temp_entry(entry):
+    """Remove a single file, link or directory from the temporary directory."""
+    try:
+        if entry.is_dir(follow_symlinks=False):
+            shutil.rmtree(entry.path)
+        else:
+            os.unlink(entry.path)
+    except Exception as e:
+        print(f"Error cleaning temp directory: {e}")
+
 def clean_temp_directory():
     """Clean up the temporary directory by removing all files."""
-    for filename in os.listdir(TEMP_DIR):
-        file_path = os.path.join(TEMP_DIR, filename)
-        try:
-            if os.path.isfile(file_path) or os.path.islink(file_path):
-                os.unlink(file_path)
-            elif os.path.isdir(file_path):
-                shutil.rmtree(file_path)
-        except Exception as e:
-            print(f"Error cleaning temp directory: {e}")
+    # Unlinking is I/O-bound, so remove entries in parallel
+    with os.scandir(TEMP_DIR) as entries, ThreadPoolExecutor(max_workers=CLEANUP_WORKERS) as executor:
+        executor.map(remove_temp_entry, entries)
     print(f"Temp directory cleaned at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     sys.stdout.flush()
 
@@ -71,24 +135,54 @@ def allowed_file(filename):
     ext = filename.rsplit('.', 1)[1].lower() if '.' in filename else ''
     return ext in ALLOWED_AUDIO_EXTENSIONS or ext in ALLOWED_VIDEO_EXTENSIONS
 
-def convert_to_mp3(input_file, output_file):
-    """Convert audio or video file to mp3 format."""
+def stage_upload(file, destination):
+    """Place an uploaded file at a new destination, hard-linking the spooled upload when possible."""
+    stream = file.stream
+    spooled_path = getattr(stream, 'name', None)
+    
+    # UploadRequest spools uploads into TEMP_DIR, so the link stays on one filesystem
+    if isinstance(spooled_path, str):
+        stream.flush()
+        os.link(spooled_path, destination)
+        return
+    
+    # Stream without a backing file, copy it into a newly created destination
+    stream.seek(0)
+    with open(destination, 'xb') as f:
+        shutil.copyfileobj(stream, f, COPY_BUFFER_SIZE)
+
+def convert_to_mp3(input_file):
+    """Convert audio or video file to mp3 format, returning the mp3 data."""
     try:
-        # For audio files, use pydub
-        input_ext = input_file.rsplit('.', 1)[1].lower() if '.' in input_file else ''
-        
-        if input_ext in ALLOWED_AUDIO_EXTENSIONS:
-            audio = AudioSegment.from_file(input_file)
-            audio.export(output_file, format="mp3")
-        else:
-            # For video files, use ffmpeg
-            os.system(f'ffmpeg -i "{input_file}" -q:a 0 -map a "{output_file}" -y')
-        
-        return True
+        # Read the staged file (some containers need seeking) and capture the mp3 from stdout.
+        # Speech models work on 16 kHz mono audio, so there's no point uploading more than that
+        result = subprocess.run(
+            [
+                "ffmpeg", "-nostdin", "-loglevel", "error",
+                "-i", input_file,
+                "-vn", "-ac", "1", "-ar", "16000",
+                "-c:a", "libmp3lame", "-q:a", "5",
+                "-f", "mp3", "pipe:1"
+            ],
+            stdout=subprocess.PIPE,
+            check=True
+        )
+        return result.stdout
     except Exception as e:
         print(f"Conversion error: {e}")
         sys.stdout.flush()
-        return False
+        return None
+
+def get_fal_client(fal_key):
+    """Get a cached fal.ai client for the API key, creating it if needed."""
+    # Avoid keeping plaintext API keys as cache keys
+    cache_key = hashlib.blake2b(fal_key.encode('utf-8'), digest_size=16).digest()
+    with fal_client_cache_lock:
+        client = fal_client_cache.get(cache_key)
+        if client is None:
+            client = fal_client.client.SyncClient(key=fal_key)
+            fal_client_cache[cache_key] = client
+    return client
 
 def parse_proxy_string(proxy_string):
     """Parse proxy string in format 'username:password@hostname:port'"""
@@ -96,30 +190,33 @@ def parse_proxy_string(proxy_string):
         return None
         
     # Basic validation of proxy string format
-    pattern = r'^([^:]+):([^@]+)@([^:]+):(\d+)$'
-    match = re.match(pattern, proxy_string)
+    match = PROXY_PATTERN.match(proxy_string)
     if not match:
         return None
         
-    username, password, host, port = match.groups()
-    return {
-        'username': username,
-        'password': password,
-        'host': host,
-        'port': port
-    }
+    # (username, password, host, port)
+    return match.groups()
+
+get_snippet_fields = attrgetter('text', 'start', 'duration')
 
 def convert_transcript_to_json(transcript):
     """Convert a FetchedTranscript object to JSON-serializable format"""
     # Convert each snippet to a dictionary
-    snippets = []
-    for snippet in transcript.snippets:
-        snippets.append({
-            'text': snippet.text,
-            'start': snippet.start,
-            'duration': snippet.duration
-        })
-    return snippets
+    return [
+        {'text': text, 'start': start, 'duration': duration}
+        for text, start, duration in map(get_snippet_fields, transcript.snippets)
+    ]
+
+def cache_transcript(cache_key, response_data):
+    """Store a successful transcript response in the cache and return it."""
+    with transcript_cache_lock:
+        transcript_cache[cache_key] = response_data
+    return response_data
+
+@app.errorhandler(413)
+def file_too_large(error=None):
+    """Return a JSON error for uploads over the size limit."""
+    return jsonify({"error": f"File too large, maximum size is {MAX_FILE_SIZE / (1024 * 1024 * 1024):.1f} GB"}), 413
 
 @app.route('/health', methods=['GET'])
 def health_check():
@@ -141,6 +238,10 @@ def transcribe_file():
     Returns:
     - JSON with transcription text and chunks
     """
+    # Check the declared request size before the upload is parsed
+    if (request.content_length or 0) > MAX_FILE_SIZE:
+        return file_too_large()
+    
     # Check if file is in the request
     if 'file' not in request.files:
         return jsonify({"error": "No file provided"}), 400
@@ -156,7 +257,8 @@ def transcribe_file():
         return jsonify({"error": "File format not accepted"}), 400
     
     # Get language parameter (default to English if not provided)
-    language = request.form.get('language', 'en').lower()
+    language = request.form.get('language', 'en')
+    language = language.lower() if language else 'en'
     
     # Validate language - if not supported, use English as default
     if language not in SUPPORTED_LANGUAGES:
@@ -179,40 +281,29 @@ def transcribe_file():
         return jsonify({"error": "Failed to decrypt FAL API key"}), 400
     
     try:
-        # Save file to temp directory with streaming approach to handle large files
+        # Stage the spooled upload in the temp directory
         filename = secure_filename(file.filename)
-        original_file_path = os.path.join(TEMP_DIR, filename)
+        # Prefix with a unique id so concurrent uploads with the same name never share a path
+        original_file_path = os.path.join(TEMP_DIR, f"{uuid4().hex}-{filename}")
+        stage_upload(file, original_file_path)
         
-        # Stream the file to disk instead of loading it all into memory
-        with open(original_file_path, 'wb') as f:
-            chunk_size = 4096  # 4KB chunks
-            while True:
-                chunk = file.read(chunk_size)
-                if not chunk:
-                    break
-                f.write(chunk)
-        
-        # Get file size after saving
-        file_size = os.path.getsize(original_file_path)
-        
-        # Check file size after saving
-        if file_size > MAX_FILE_SIZE:
-            os.remove(original_file_path)
-            return jsonify({"error": f"File too large, maximum size is {MAX_FILE_SIZE / (1024 * 1024 * 1024):.1f} GB"}), 400
-        
-        # Convert to mp3
-        mp3_filename = f"{os.path.splitext(filename)[0]}.mp3"
-        mp3_file_path = os.path.join(TEMP_DIR, mp3_filename)
-        
-        if not convert_to_mp3(original_file_path, mp3_file_path):
-            os.remove(original_file_path)
-            return jsonify({"error": "Failed to convert file to mp3"}), 500
+        # Convert to mp3 in memory, unless the upload already is one
+        is_mp3 = os.path.splitext(filename)[1].lower() == '.mp3'
+        if not is_mp3:
+            mp3_data = convert_to_mp3(original_file_path)
+            if mp3_data is None:
+                os.remove(original_file_path)
+                return jsonify({"error": "Failed to convert file to mp3"}), 500
         
-        # Create a client instance with the provided API key
-        client = fal_client.client.SyncClient(key=fal_key)
+        # Get a client instance for the provided API key
+        client = get_fal_client(fal_key)
         
         # Upload to fal.ai
-        audio_url = client.upload_file(mp3_file_path)
+        if is_mp3:
+            audio_url = client.upload_file(original_file_path)
+        else:
+            mp3_filename = f"{os.path.splitext(filename)[0]}.mp3"
+            audio_url = client.upload(mp3_data, "audio/mpeg", mp3_filename)
         
         # Call fal.ai API to transcribe the audio
         result = client.subscribe(
@@ -228,7 +319,6 @@ def transcribe_file():
         
         # Clean up files
         os.remove(original_file_path)
-        os.remove(mp3_file_path)
         
         return jsonify({
             "status": "success",
@@ -242,8 +332,6 @@ def transcribe_file():
         # Clean up files in case of error
         if 'original_file_path' in locals() and os.path.exists(original_file_path):
             os.remove(original_file_path)
-        if 'mp3_file_path' in locals() and os.path.exists(mp3_file_path):
-            os.remove(mp3_file_path)
         
         return jsonify({"error": f"Transcription failed: {str(e)}"}), 500
 
@@ -280,9 +368,6 @@ def transcribe_youtube():
         # Configure proxy if provided
         proxy_config = None
         if encrypted_proxy:
-            if not SECRET_KEY:
-                return jsonify({"error": "Secret key not configured"}), 500
-                
             # Decrypt the proxy string
             proxy_string = decrypt(encrypted_proxy, SECRET_KEY)
             if not proxy_string:
@@ -291,7 +376,8 @@ def transcribe_youtube():
             proxy_parts = parse_proxy_string(proxy_string)
             if proxy_parts:
                 # Build proxy URL
-                http_proxy = f"http://{proxy_parts['username']}:{proxy_parts['password']}@{proxy_parts['host']}:{proxy_parts['port']}"
+                username, password, host, port = proxy_parts
+                http_proxy = f"http://{username}:{password}@{host}:{port}"
                 
                 # Configure using http URL
                 proxy_config = GenericProxyConfig(
@@ -300,6 +386,13 @@ def transcribe_youtube():
             else:
                 return jsonify({"error": "Invalid proxy string format. Expected format: username:password@hostname:port"}), 400
         
+        # Serve repeated requests from the cache, once the request itself is known to be valid
+        cache_key = (str(video_id), str(language), bool(preserve_formatting))
+        with transcript_cache_lock:
+            cached_response = transcript_cache.get(cache_key)
+        if cached_response is not None:
+            return jsonify(cached_response)
+        
         # Create YouTubeTranscriptApi instance with proxy config
         ytt_api = YouTubeTranscriptApi(proxy_config=proxy_config)
         
@@ -307,108 +400,112 @@ def transcribe_youtube():
             # Get all available transcripts
             transcript_list = ytt_api.list(video_id)
             
-            # First priority: Try to get manual transcript in requested language
-            try:
-                # Check if manual transcript exists in the requested language
-                manual_transcript = transcript_list.find_manually_created_transcript([language])
-                if manual_transcript:
-                    transcript_data = manual_transcript.fetch(preserve_formatting=preserve_formatting)
-                    return jsonify({
+            # Classify the available transcripts in a single pass
+            manual_target = None
+            generated_target = None
+            generated_any = None
+            manual_translatable = None
+            all_transcripts = []
+            for transcript in transcript_list:
+                all_transcripts.append(transcript)
+                if transcript.is_generated:
+                    if generated_target is None and transcript.language_code == language:
+                        generated_target = transcript
+                    elif generated_any is None:
+                        generated_any = transcript
+                elif manual_target is None and transcript.language_code == language:
+                    manual_target = transcript
+                elif manual_translatable is None and transcript.is_translatable:
+                    manual_translatable = transcript
+            
+            # First priority: Manual transcript in requested language
+            if manual_target:
+                try:
+                    transcript_data = manual_target.fetch(preserve_formatting=preserve_formatting)
+                    return jsonify(cache_transcript(cache_key, {
                         "transcript": convert_transcript_to_json(transcript_data), 
                         "language": language,
                         "is_generated": False
-                    })
-            except Exception:
-                pass
-                
-            # Second priority: Try to get ANY generated transcript in its original language
-            try:
-                # Get all available language codes
-                all_languages = [t.language_code for t in transcript_list]
-                
-                # Try with the specific find_generated_transcript method
+                    }))
+                except Exception:
+                    pass
+            
+            # Second priority: Generated transcript, preferring the requested language
+            generated_transcript = generated_target or generated_any
+            if generated_transcript:
                 try:
-                    generated_transcript = transcript_list.find_generated_transcript(all_languages)
-                    if generated_transcript:
-                        original_language = generated_transcript.language_code
-                        transcript_data = generated_transcript.fetch(preserve_formatting=preserve_formatting)
-                        return jsonify({
-                            "transcript": convert_transcript_to_json(transcript_data), 
-                            "language": original_language, 
-                            "is_generated": True
-                        })
+                    transcript_data = generated_transcript.fetch(preserve_formatting=preserve_formatting)
+                    response_data = {
+                        "transcript": convert_transcript_to_json(transcript_data), 
+                        "language": generated_transcript.language_code, 
+                        "is_generated": True
+                    }
+                    # Other languages may only be a stand-in after a transient failure, so don't cache them
+                    if generated_transcript is generated_target:
+                        cache_transcript(cache_key, response_data)
+                    return jsonify(response_data)
                 except Exception:
                     pass
-                    
-                # Alternative approach - try to find ANY generated transcript
-                for transcript in transcript_list:
-                    if transcript.is_generated:
-                        transcript_data = transcript.fetch(preserve_formatting=preserve_formatting)
-                        return jsonify({
-                            "transcript": convert_transcript_to_json(transcript_data), 
-                            "language": transcript.language_code, 
-                            "is_generated": True
-                        })
-            except Exception:
-                pass
-                
-            # Third priority: Try to get ANY manual transcript and translate it to requested language
-            try:
-                for transcript in transcript_list:
-                    if not transcript.is_generated and transcript.is_translatable:
-                        translated = transcript.translate(language)
-                        transcript_data = translated.fetch(preserve_formatting=preserve_formatting)
-                        return jsonify({
-                            "transcript": convert_transcript_to_json(transcript_data), 
-                            "language": language, 
-                            "original_language": transcript.language_code,
-                            "translated": True,
-                            "is_generated": False
-                        })
-            except Exception:
-                pass
             
-            # Fourth priority: Try an auto-generated transcript in ANY language
-            try:
-                # Try each transcript individually
-                for transcript in transcript_list:
-                    try:
-                        transcript_data = transcript.fetch(preserve_formatting=preserve_formatting)
+            # Third priority: Manual transcript translated to requested language
+            if manual_translatable:
+                try:
+                    translated = manual_translatable.translate(language)
+                    transcript_data = translated.fetch(preserve_formatting=preserve_formatting)
+                    return jsonify({
+                        "transcript": convert_transcript_to_json(transcript_data), 
+                        "language": language, 
+                        "original_language": manual_translatable.language_code,
+                        "translated": True,
+                        "is_generated": False
+                    })
+                except Exception:
+                    pass
+            
+            # Fourth priority: Any transcript not attempted yet, fetched in parallel
+            remaining_transcripts = [
+                t for t in all_transcripts
+                if t is not manual_target and t is not generated_transcript
+            ]
+            if remaining_transcripts:
+                executor = ThreadPoolExecutor(max_workers=FALLBACK_FETCH_WORKERS)
+                try:
+                    futures = {
+                        executor.submit(transcript.fetch, preserve_formatting=preserve_formatting): transcript
+                        for transcript in remaining_transcripts
+                    }
+                    for future in as_completed(futures):
+                        transcript = futures[future]
+                        try:
+                            transcript_data = future.result()
+                        except Exception:
+                            continue
+                        # Whichever fetch finishes first wins, so this isn't cached
                         return jsonify({
                             "transcript": convert_transcript_to_json(transcript_data), 
                             "language": transcript.language_code,
                             "is_generated": transcript.is_generated
                         })
-                    except Exception:
-                        continue
-            except Exception:
-                pass
+                finally:
+                    # Don't wait for slower fetches once one has succeeded
+                    executor.shutdown(wait=False, cancel_futures=True)
             
-            # Last resort: Try a direct fetch with language
+            # Last resort: A single direct fetch, preferring the requested language over the others
             try:
-                transcript_data = ytt_api.fetch(video_id, languages=[language], preserve_formatting=preserve_formatting)
+                all_languages = [language] + [t.language_code for t in all_transcripts if t.language_code != language]
+                transcript_data = ytt_api.fetch(video_id, languages=all_languages, preserve_formatting=preserve_formatting)
+                if transcript_data.language_code == language:
+                    return jsonify({
+                        "transcript": convert_transcript_to_json(transcript_data), 
+                        "language": language
+                    })
                 return jsonify({
                     "transcript": convert_transcript_to_json(transcript_data), 
-                    "language": language
+                    "language": transcript_data.language_code,
+                    "last_resort": True
                 })
             except Exception:
                 pass
-            
-            # Try direct fetch with ANY language as final attempt
-            try:
-                # Try each language code we know about
-                for lang_code in all_languages:
-                    try:
-                        transcript_data = ytt_api.fetch(video_id, languages=[lang_code], preserve_formatting=preserve_formatting)
-                        return jsonify({
-                            "transcript": convert_transcript_to_json(transcript_data), 
-                            "language": lang_code,
-                            "last_resort": True
-                        })
-                    except Exception:
-                        continue
-            except Exception:
-                pass
                 
             # If we got this far, we've tried everything and failed
             return jsonify({"error": "No transcript found for this video after multiple attempts"}), 404
@@ -438,20 +535,34 @@ def before_request():
     """Store the start time for calculating processing time."""
     request.start_time = time.time()
 
-def run_scheduler():
-    """Run the scheduler in a separate thread."""
-    schedule.every().day.at("00:00").do(clean_temp_directory)
-    
-    while True:
-        schedule.run_pending()
-        time.sleep(60)
+def schedule_temp_cleanup():
+    """Schedule the next temp directory cleanup for midnight."""
+    now = datetime.now()
+    next_midnight = now.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+    timer = threading.Timer((next_midnight - now).total_seconds(), run_temp_cleanup)
+    timer.daemon = True
+    timer.start()
+
+def run_temp_cleanup():
+    """Clean up the temp directory and schedule the next cleanup."""
+    try:
+        clean_temp_directory()
+    finally:
+        schedule_temp_cleanup()
 
 if __name__ == '__main__':
-    # Start the scheduler in a separate thread
-    scheduler_thread = threading.Thread(target=run_scheduler, daemon=True)
-    scheduler_thread.start()
+    # Schedule the daily temp directory cleanup
+    schedule_temp_cleanup()
     
     port = int(os.environ.get('PORT', 5000))
-    print(f"Starting server on port {port}")
+    print(f"Starting server on port {port} with {SERVER_THREADS} threads")
     sys.stdout.flush()
-    app.run(host='0.0.0.0', port=port)
+    # Requests mostly wait on ffmpeg and fal.ai, so serve them from a thread pool
+    serve(
+        app,
+        host='0.0.0.0',
+        port=port,
+        threads=SERVER_THREADS,
+        max_request_body_size=MAX_FILE_SIZE,
+        channel_timeout=REQUEST_TIMEOUT
+    )
@@ -6,6 +6,7 @@ These functions use AES-GCM algorithm for encryption, compatible with the TypeSc
 import os
 import sys
 import base64
+from functools import lru_cache
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
@@ -40,6 +41,19 @@ def derive_key(secret_key: str) -> bytes:
     
     return kdf.derive(secret_key)
 
+@lru_cache(maxsize=8)
+def get_cipher(secret_key: str) -> AESGCM:
+    """
+    Gets the AES-GCM cipher for a secret key, deriving the key only once per secret
+    
+    Args:
+        secret_key: The secret key to derive from
+        
+    Returns:
+        AESGCM instance with the derived key
+    """
+    return AESGCM(derive_key(secret_key))
+
 def encrypt(text: str, secret_key: str) -> str:
     """
     Encrypts a string using AES-GCM
@@ -55,15 +69,12 @@ def encrypt(text: str, secret_key: str) -> str:
     if not text or text.strip() == "":
         return None
     
-    # Derive key from secret
-    key = derive_key(secret_key)
+    # Get the cipher for the derived key
+    aesgcm = get_cipher(secret_key)
     
     # Generate a random 96-bit IV (12 bytes)
     iv = os.urandom(12)
     
-    # Create an AESGCM instance with the derived key
-    aesgcm = AESGCM(key)
-    
     # Encrypt the data
     data = text.encode('utf-8')
     encrypted_data = aesgcm.encrypt(iv, data, None)
@@ -89,8 +100,8 @@ def decrypt(encrypted_text: str, secret_key: str) -> str:
     if not encrypted_text:
         return ""
     
-    # Derive key from secret - using same params as TypeScript
-    key = derive_key(secret_key)
+    # Get the cipher for the key derived from secret - using same params as TypeScript
+    aesgcm = get_cipher(secret_key)
     
     try:
         # Decode base64
@@ -100,9 +111,6 @@ def decrypt(encrypted_text: str, secret_key: str) -> str:
         iv = encrypted_data[:12]
         ciphertext = encrypted_data[12:]
         
-        # Create an AESGCM instance with the derived key
-        aesgcm = AESGCM(key)
-        
         # Decrypt the data
         decrypted_data = aesgcm.decrypt(iv, ciphertext, None)
         return decrypted_data.decode('utf-8')